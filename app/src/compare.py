@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Mapping, Optional
 from .rules import DEPENDENCIES, RULE_DESCRIPTIONS
 
 
@@ -16,11 +16,22 @@ def list_to_count_map(detected_items: List[Dict[str, Any]]) -> Dict[str, int]:
     return m
 
 
-def compare_with_rules(order_items: Dict[str, int], detected_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+def compare_with_rules(
+    order_items: Dict[str, int],
+    detected_items: List[Dict[str, Any]],
+    dependencies: Optional[Mapping[str, Mapping[str, int]]] = None,
+    rule_descriptions: Optional[Mapping[str, str]] = None,
+) -> Dict[str, Any]:
     """
     order_items: {"burger":1,"fries":1,"drink":1,"nuggets":1}
     detected_items: [{"class":"burger","count":1}, ...]
+    dependencies / rule_descriptions: 店舗ごとのルール（省略時は rules.py の定義）
     """
+    if dependencies is None:
+        dependencies = DEPENDENCIES
+    if rule_descriptions is None:
+        rule_descriptions = RULE_DESCRIPTIONS
+
     detected_map = list_to_count_map(detected_items)
 
     result = {
@@ -40,7 +51,7 @@ def compare_with_rules(order_items: Dict[str, int], detected_items: List[Dict[st
             result["extra"][cls] = got - need
 
     # 2) 规则检查：nuggets -> sauce
-    for parent, deps in DEPENDENCIES.items():
+    for parent, deps in dependencies.items():
         parent_need = int(order_items.get(parent, 0))
         if parent_need <= 0:
             continue
@@ -50,7 +61,7 @@ def compare_with_rules(order_items: Dict[str, int], detected_items: List[Dict[st
             dep_got = int(detected_map.get(dep_cls, 0))
             if dep_got < dep_need:
                 result["rule_missing"][dep_cls] = dep_need - dep_got
-                desc = RULE_DESCRIPTIONS.get(parent)
+                desc = rule_descriptions.get(parent)
                 if desc and desc not in result["notes"]:
                     result["notes"].append(desc)
 
@@ -2,10 +2,15 @@ from __future__ import annotations
 
 from pathlib import Path
 import json
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, Optional, Set
 
-from .vision_yolo import detect_items
+from .vision_yolo import MODEL_CACHE, ModelCache, check_classes, detect_items
 from .compare import compare_with_rules
+from .stores import DEFAULT_STORE_ID, StoreProfile, load_store_profiles
+from .resources import track_memory
+
+STORES_DIR = Path(__file__).resolve().parents[1] / "stores"
 
 
 def load_order(path: Path) -> dict:
@@ -18,19 +23,88 @@ def load_order(path: Path) -> dict:
     return {k: int(v) for k, v in data["items"].items()}
 
 
-def run_pipeline(order_items: dict, image_path: str) -> Dict[str, Any]:
-    detected_items, vis_path = detect_items(
-        image_path,
-        save_vis=True,
-        vis_dir="outputs/vis",
-        conf=0.25,
-    )
+class StoreRouter:
+    """
+    store_id ごとにプロファイルを引き、対応するモデル・ルールで判定する。
+
+    プロファイルは起動時に一度だけ読み込み、モデルは model_cache で共有する。
+    各店舗の classes は重みのクラス定義と一致するか、初回に確認する。
+    """
+
+    def __init__(
+        self,
+        profiles: Dict[str, StoreProfile],
+        *,
+        model_cache: ModelCache = MODEL_CACHE,
+        preload: bool = True,
+    ) -> None:
+        self.profiles = dict(profiles)
+        self.model_cache = model_cache
+        self._checked: Set[str] = set()
+
+        if preload:
+            # 重複する重みは 1 回だけ読み込まれる
+            model_cache.preload(sorted({p.model_path for p in self.profiles.values()}))
+            for store_id in sorted(self.profiles):
+                self._check(self.profiles[store_id])
+
+    def _check(self, profile: StoreProfile) -> None:
+        check_classes(self.model_cache.get(profile.model_path).model, profile.classes)
+        self._checked.add(profile.store_id)
+
+    def profile(self, store_id: str) -> StoreProfile:
+        try:
+            return self.profiles[store_id]
+        except KeyError:
+            raise ValueError(f"unknown store_id: {store_id}") from None
+
+    def run(self, order_items: dict, image_path: str, store_id: str = DEFAULT_STORE_ID) -> Dict[str, Any]:
+        profile = self.profile(store_id)
+        if profile.store_id not in self._checked:
+            self._check(profile)
+
+        # リクエストごとのピークメモリを記録する
+        with track_memory() as memory:
+            detected_items, vis_path = detect_items(
+                image_path,
+                save_vis=True,
+                vis_dir="outputs/vis",
+                vis_subdir=profile.store_id,
+                conf=profile.conf,
+                model_path=profile.model_path,
+                classes=profile.classes,
+                model_cache=self.model_cache,
+            )
+
+        result = compare_with_rules(
+            order_items,
+            detected_items,
+            dependencies=profile.dependencies,
+            rule_descriptions=profile.rule_descriptions,
+        )
+
+        return {
+            "store_id": profile.store_id,
+            "order": order_items,
+            "detected": detected_items,
+            "result": result,
+            "vis_image": vis_path,
+            "memory": memory,
+        }
+
+
+_ROUTER: Optional[StoreRouter] = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_router() -> StoreRouter:
+    """STORES_DIR のプロファイルから作った共有ルーターを返す（初回のみ生成）。"""
+    global _ROUTER
+    with _ROUTER_LOCK:
+        if _ROUTER is None:
+            _ROUTER = StoreRouter(load_store_profiles(STORES_DIR))
+        return _ROUTER
 
-    result = compare_with_rules(order_items, detected_items)
 
-    return {
-        "order": order_items,
-        "detected": detected_items,
-        "result": result,
-        "vis_image": vis_path,
-    }
+def run_pipeline(order_items: dict, image_path: str, store_id: str = DEFAULT_STORE_ID) -> Dict[str, Any]:
+    return get_router().run(order_items, image_path, store_id)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Optional
+
+# =====================
+VIS_MAX_BYTES = 200 * 1024 ** 2
+VIS_MAX_AGE_SECONDS = 24 * 60 * 60
+RSS_SAMPLE_INTERVAL = 0.01
+# =====================
+
+
+def current_rss() -> Optional[int]:
+    """現在の RSS（バイト）を返す。/proc が無い環境では None。"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+@contextmanager
+def track_memory(interval: float = RSS_SAMPLE_INTERVAL) -> Iterator[Dict[str, Optional[int]]]:
+    """
+    ブロック実行中のプロセス RSS をバックグラウンドスレッドで定期取得し、ピークを記録する。
+
+    with track_memory() as mem:
+        ...
+    mem -> {"peak_rss_bytes": ..., "peak_delta_bytes": ..., "rss_bytes": ...}
+
+    RSS はプロセス全体の値のため、torch など Python 外の割り当ても含む。
+    一方、同時に実行中の他リクエストの使用量も含まれる点に注意。
+    peak_delta_bytes は開始時点からのピーク増加量。
+    /proc が無い環境ではすべて None。
+    """
+    report: Dict[str, Optional[int]] = {
+        "peak_rss_bytes": None,
+        "peak_delta_bytes": None,
+        "rss_bytes": None,
+    }
+
+    start = current_rss()
+    if start is None:
+        yield report
+        return
+
+    peak = [start]
+    done = threading.Event()
+
+    def sample() -> None:
+        while not done.wait(interval):
+            rss = current_rss()
+            if rss is not None and rss > peak[0]:
+                peak[0] = rss
+
+    sampler = threading.Thread(target=sample, name="rss-sampler", daemon=True)
+    sampler.start()
+
+    try:
+        yield report
+    finally:
+        done.set()
+        sampler.join()
+        end = current_rss()
+        if end is not None and end > peak[0]:
+            peak[0] = end
+        report["peak_rss_bytes"] = peak[0]
+        report["peak_delta_bytes"] = peak[0] - start
+        report["rss_bytes"] = end
+
+
+def prune_dir(
+    directory: str | Path,
+    *,
+    max_bytes: Optional[int] = VIS_MAX_BYTES,
+    max_age_seconds: Optional[float] = VIS_MAX_AGE_SECONDS,
+    pattern: str = "*",
+    exclude: Collection[str | Path] = (),
+) -> List[Path]:
+    """
+    directory 内のファイルを古い順に削除し、サイズ・経過時間の上限に収める。
+
+    - max_age_seconds より古いファイルは削除
+    - 残りの合計が max_bytes を超える場合、古いものから削除
+    - exclude のファイル（使用中のものなど）は削除しない（サイズには含める）
+
+    Returns
+    -------
+    削除したファイルのパス一覧
+    """
+    d = Path(directory)
+    if not d.exists():
+        return []
+
+    keep = {Path(p).resolve() for p in exclude}
+
+    entries = []
+    for p in d.glob(pattern):
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        if p.is_file():
+            entries.append((st.st_mtime, st.st_size, p))
+    entries.sort()
+
+    now = time.time()
+    total = sum(size for _, size, _ in entries)
+    removed: List[Path] = []
+
+    for mtime, size, p in entries:
+        too_old = max_age_seconds is not None and now - mtime > max_age_seconds
+        too_big = max_bytes is not None and total > max_bytes
+        if not (too_old or too_big) or p.resolve() in keep:
+            continue
+        try:
+            p.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed.append(p)
+
+    return removed
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+from pathlib import Path
+
+from .pipeline import STORES_DIR, StoreRouter, load_order
+from .stores import load_store_profiles
+from .resources import current_rss
+
+
+def main():
+    # コマンドライン引数定義
+    parser = argparse.ArgumentParser(
+        description="demo 画像で判定を繰り返し、RSS が増え続けないことを確認する"
+    )
+    parser.add_argument("--iterations", type=int, default=10_000)
+    parser.add_argument("--warmup", type=int, default=50, help="RSS 基準値を取る前の実行回数")
+    parser.add_argument("--max-growth-mb", type=float, default=64.0, help="許容する RSS 増加量（MB）")
+    parser.add_argument("--store", default="default", help="店舗ID")
+    parser.add_argument("--stores-dir", type=Path, default=STORES_DIR, help="店舗プロファイルのディレクトリ")
+    args = parser.parse_args()
+
+    # プロジェクトルート取得（app/）
+    root = Path(__file__).resolve().parents[1]
+
+    images = sorted((root / "demo_images").glob("*.jpg"))
+    orders = sorted((root / "orders").glob("*.json"))
+    if not images or not orders:
+        raise SystemExit("demo_images / orders が見つかりません")
+
+    order_items = [load_order(p) for p in orders]
+
+    # 対象店舗のモデルだけを読み込む
+    profiles = load_store_profiles(args.stores_dir)
+    if args.store not in profiles:
+        raise SystemExit(f"unknown store_id: {args.store}")
+    router = StoreRouter({args.store: profiles[args.store]})
+
+    baseline = None
+    peak_bytes = 0
+
+    for i in range(args.iterations):
+        out = router.run(order_items[i % len(order_items)], str(images[i % len(images)]), args.store)
+        peak_bytes = max(peak_bytes, out["memory"]["peak_delta_bytes"] or 0)
+        del out
+
+        if i + 1 == args.warmup:
+            gc.collect()
+            baseline = current_rss()
+
+        if (i + 1) % 1000 == 0:
+            print(f"[INFO] {i + 1}/{args.iterations} rss={current_rss()}")
+
+    gc.collect()
+    final = current_rss()
+
+    print(f"\n[soak] iterations      : {args.iterations}")
+    print(f"[soak] request peak Δ  : {peak_bytes / 1024 ** 2:.1f} MB")
+
+    if baseline is None or final is None:
+        print("[soak] RSS を取得できないため判定をスキップします")
+        return
+
+    growth_mb = (final - baseline) / 1024 ** 2
+    print(f"[soak] rss baseline    : {baseline / 1024 ** 2:.1f} MB")
+    print(f"[soak] rss final       : {final / 1024 ** 2:.1f} MB")
+    print(f"[soak] rss growth      : {growth_mb:+.1f} MB (limit {args.max_growth_mb:.1f} MB)")
+
+    if growth_mb > args.max_growth_mb:
+        print("[soak] ❌ RSS が増え続けています")
+        sys.exit(1)
+
+    print("[soak] ✅ RSS は一定です")
+
+
+if __name__ == "__main__":
+    main()
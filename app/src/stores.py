@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+
+from .rules import DEPENDENCIES, RULE_DESCRIPTIONS
+from .vision_yolo import CLASSES, MODEL_PATH
+
+DEFAULT_STORE_ID = "default"
+
+
+def freeze_rules(dependencies: Mapping[str, Mapping[str, int]]) -> Mapping[str, Mapping[str, int]]:
+    """ルール定義を深くコピーし、読み取り専用にする。"""
+    return MappingProxyType({
+        str(parent): MappingProxyType({str(dep): int(n) for dep, n in deps.items()})
+        for parent, deps in dependencies.items()
+    })
+
+
+@dataclass(frozen=True)
+class StoreProfile:
+    """
+    店舗ごとの設定（モデル・クラス・閾値・ルール）。
+
+    同じ model_path を持つ店舗同士は、モデルインスタンスを共有する。
+    classes / dependencies / rule_descriptions は読み取り専用で、
+    他の店舗や rules.py の定義とは共有しない。
+    """
+    store_id: str
+    model_path: str = MODEL_PATH
+    classes: Tuple[str, ...] = tuple(CLASSES)
+    conf: float = 0.25
+    dependencies: Mapping[str, Mapping[str, int]] = field(
+        default_factory=lambda: freeze_rules(DEPENDENCIES)
+    )
+    rule_descriptions: Mapping[str, str] = field(
+        default_factory=lambda: MappingProxyType(dict(RULE_DESCRIPTIONS))
+    )
+
+
+def default_profile() -> StoreProfile:
+    """既存のモジュール定数（MODEL_PATH / CLASSES / rules）から作る既定プロファイル。"""
+    return StoreProfile(store_id=DEFAULT_STORE_ID)
+
+
+def load_store_profile(path: Path) -> StoreProfile:
+    """
+    店舗プロファイル JSON を読み込む。
+
+    例:
+    {
+      "store_id": "shibuya",
+      "model_path": "models/shibuya.pt",
+      "classes": ["burger", "drink", "fries", "nuggets", "sauce"],
+      "conf": 0.3,
+      "dependencies": {"nuggets": {"sauce": 1}},
+      "rule_descriptions": {"nuggets": "ナゲットにはソースが必要です"}
+    }
+
+    store_id 以外は省略可能で、省略時は既定値を使う。
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if "store_id" not in data:
+        raise ValueError(f"store profile must contain 'store_id': {path}")
+
+    base = default_profile()
+
+    classes = data.get("classes", list(base.classes))
+    if not isinstance(classes, list) or not all(isinstance(c, str) for c in classes):
+        raise ValueError(f"store profile 'classes' must be a list of strings: {path}")
+
+    dependencies = data.get("dependencies", base.dependencies)
+    if not isinstance(dependencies, Mapping) or not all(isinstance(d, Mapping) for d in dependencies.values()):
+        raise ValueError(f"store profile 'dependencies' must be an object of objects: {path}")
+    for parent, deps in dependencies.items():
+        unknown = [c for c in (parent, *deps) if c not in classes]
+        if unknown:
+            raise ValueError(f"store profile dependencies refer to unknown classes {unknown}: {path}")
+
+    return StoreProfile(
+        store_id=str(data["store_id"]),
+        model_path=str(data.get("model_path", base.model_path)),
+        classes=tuple(classes),
+        conf=float(data.get("conf", base.conf)),
+        dependencies=freeze_rules(dependencies),
+        rule_descriptions=MappingProxyType({
+            str(k): str(v)
+            for k, v in data.get("rule_descriptions", base.rule_descriptions).items()
+        }),
+    )
+
+
+def load_store_profiles(stores_dir: Path) -> Dict[str, StoreProfile]:
+    """
+    stores_dir 内の *.json をすべて読み込み、store_id -> StoreProfile を返す。
+    既定プロファイル（"default"）は常に含まれる（JSON 側で上書き可能）。
+    """
+    profiles: Dict[str, StoreProfile] = {DEFAULT_STORE_ID: default_profile()}
+
+    if stores_dir.exists():
+        for p in sorted(stores_dir.glob("*.json")):
+            profile = load_store_profile(p)
+            profiles[profile.store_id] = profile
+
+    return profiles
@@ -1,23 +1,162 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Tuple
+from collections import OrderedDict
+from typing import Any, Dict, List, Sequence, Tuple
 from pathlib import Path
+import itertools
+import threading
 
 import cv2
 from ultralytics import YOLO
 
+from .resources import VIS_MAX_AGE_SECONDS, VIS_MAX_BYTES, prune_dir
+
 # =====================
 MODEL_PATH = "models/best.pt"
 CLASSES = ["burger", "drink", "fries", "nuggets", "sauce"]
+MODEL_CACHE_BUDGET_BYTES = 2 * 1024 ** 3
 # =====================
 
 
+class CachedModel:
+    """
+    キャッシュ上の YOLO モデル。
+
+    Ultralytics の predictor はスレッドセーフではないため、
+    predict は lock を取ってから呼ぶ。
+    """
+
+    def __init__(self, model: YOLO, size: int) -> None:
+        self.model = model
+        self.size = size
+        self.lock = threading.Lock()
+
+
+class ModelCache:
+    """
+    重みファイルごとに YOLO モデルを保持する LRU キャッシュ。
+
+    同じ重みを使う店舗はインスタンスを共有し、合計サイズが budget_bytes を
+    超える場合は、最も長く使われていないモデルから解放する。
+    サイズは読み込み後のパラメータ・バッファのバイト数で測る。
+    読み込みは重みファイルごとのロックで行い、他のモデルの取得は妨げない。
+
+    predict 中（lock 取得中）のモデルは解放しない。すべて使用中の場合は
+    一時的に budget_bytes を超えることがある。
+    """
+
+    def __init__(self, budget_bytes: int = MODEL_CACHE_BUDGET_BYTES) -> None:
+        self.budget_bytes = int(budget_bytes)
+        self._models: "OrderedDict[str, CachedModel]" = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model_path: str) -> str:
+        return str(Path(model_path).resolve())
+
+    def _lookup(self, key: str) -> CachedModel | None:
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+                # 使用中で解放を見送ったモデルがあれば、ここで予算内に戻す
+                self._evict(keep=key)
+            return entry
+
+    def get(self, model_path: str) -> CachedModel:
+        """モデルを返す。未ロードの場合のみ読み込む。"""
+        key = self._key(model_path)
+
+        entry = self._lookup(key)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # 待っている間に別スレッドが読み込んだ場合はそれを使う
+            entry = self._lookup(key)
+            if entry is not None:
+                return entry
+
+            model = YOLO(model_path)
+            entry = CachedModel(model, _model_bytes(model))
+
+            with self._lock:
+                self._models[key] = entry
+                self._evict(keep=key)
+                self._loading.pop(key, None)
+
+            return entry
+
+    def preload(self, model_paths: Sequence[str]) -> None:
+        """起動時に読み込んでおき、リクエスト処理中のロードを避ける。"""
+        for p in model_paths:
+            self.get(p)
+
+    def _evict(self, keep: str) -> None:
+        # keep と predict 中のモデル以外を LRU 順に解放して予算内に収める
+        total = self.total_bytes()
+        for k in list(self._models):
+            if total <= self.budget_bytes:
+                break
+            entry = self._models[k]
+            if k == keep or entry.lock.locked():
+                continue
+            del self._models[k]
+            total -= entry.size
+
+    def total_bytes(self) -> int:
+        return sum(entry.size for entry in self._models.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+
+
+def _model_bytes(model: YOLO) -> int:
+    """読み込み済みモデルのパラメータとバッファの合計バイト数。"""
+    return sum(
+        t.numel() * t.element_size()
+        for t in itertools.chain(model.model.parameters(), model.model.buffers())
+    )
+
+
+def check_classes(model: YOLO, classes: Sequence[str]) -> None:
+    """classes が重みのクラス定義（model.names）と同じ順序で一致するか確認する。"""
+    names = model.names
+    expected = [names[i] for i in sorted(names)]
+    if list(classes) != expected:
+        raise ValueError(f"classes {list(classes)} do not match model names {expected}")
+
+
+def _release_predictor_state(model: YOLO) -> None:
+    """predictor が保持する直前の入力画像・Results を手放す。"""
+    predictor = getattr(model, "predictor", None)
+    if predictor is None:
+        return
+    for attr in ("results", "batch", "plotted_img"):
+        if hasattr(predictor, attr):
+            setattr(predictor, attr, None)
+
+
+MODEL_CACHE = ModelCache()
+
+
 def detect_items(
     image_path: str,
     *,
     save_vis: bool = False,
     vis_dir: str = "outputs/vis",
+    vis_subdir: str | None = None,
     conf: float = 0.25,
+    model_path: str = MODEL_PATH,
+    classes: Sequence[str] = CLASSES,
+    model_cache: ModelCache | None = None,
+    vis_max_bytes: int | None = VIS_MAX_BYTES,
+    vis_max_age_seconds: float | None = VIS_MAX_AGE_SECONDS,
 ) -> Tuple[List[Dict[str, Any]], str | None]:
     """
     物体検出を行い、商品ごとの個数を返す。
@@ -29,20 +168,32 @@ def detect_items(
         例: [{"class": "burger", "count": 2}, ...]
     vis_path : str | None
         可視化画像の保存パス（save_vis=False の場合は None）
+
+    model_path / classes で店舗ごとのモデルとクラス一覧を指定できる。
+    モデルは model_cache（省略時は MODEL_CACHE）から取得し、毎回は読み込まない。
+
+    predictor が保持する Results・入力画像は predict 直後に解放し、
+    キャッシュ上のモデルに残さない。
+    可視化画像は vis_dir/vis_subdir（店舗ごとなど）に保存し、
+    vis_dir 以下全体を保存のたびに vis_max_bytes / vis_max_age_seconds の範囲に整理する。
     """
 
-    model = YOLO(MODEL_PATH)
-    results = model.predict(source=image_path, conf=conf, verbose=False)
-    r = results[0]
+    cache = model_cache if model_cache is not None else MODEL_CACHE
+    entry = cache.get(model_path)
+
+    # キャッシュ上のモデルは共有されるため、predict はモデルごとに直列化する
+    with entry.lock:
+        r = entry.model.predict(source=image_path, conf=conf, verbose=False)[0]
+        _release_predictor_state(entry.model)
 
     # -------- 集計 --------
-    counts: Dict[str, int] = {c: 0 for c in CLASSES}
+    counts: Dict[str, int] = {c: 0 for c in classes}
 
     if r.boxes is not None and r.boxes.cls is not None:
         for cid in r.boxes.cls.tolist():
             cid_int = int(cid)
-            if 0 <= cid_int < len(CLASSES):
-                cname = CLASSES[cid_int]
+            if 0 <= cid_int < len(classes):
+                cname = classes[cid_int]
                 counts[cname] += 1
 
     detected_list = [
@@ -51,11 +202,15 @@ def detect_items(
         if v > 0
     ]
 
+    if not save_vis:
+        # 集計が済んだ Results（元画像を保持）はここで手放す
+        del r
+
     # -------- 可視化保存 --------
     vis_path: str | None = None
 
     if save_vis:
-        out_dir = Path(vis_dir)
+        out_dir = Path(vis_dir) / vis_subdir if vis_subdir else Path(vis_dir)
         out_dir.mkdir(parents=True, exist_ok=True)
 
         stem = Path(image_path).stem
@@ -65,6 +220,15 @@ def detect_items(
         annotated = r.plot()
         cv2.imwrite(vis_path, annotated)
 
-    return detected_list, vis_path
+        # 保存が済んだ描画画像と Results は、ディレクトリ整理の前に手放す
+        del annotated, r
 
+        prune_dir(
+            vis_dir,
+            max_bytes=vis_max_bytes,
+            max_age_seconds=vis_max_age_seconds,
+            pattern="**/*_detected.jpg",
+            exclude=[vis_path],
+        )
 
+    return detected_list, vis_path
@@ -1,12 +1,20 @@
 from __future__ import annotations
+import hashlib
 import json
+import os
 import tempfile
 from pathlib import Path
 from typing import Dict, List, Any
 import pandas as pd
 import streamlit as st
 
-from app.src.pipeline import load_order, run_pipeline
+from app.src.pipeline import get_router, load_order, run_pipeline
+from app.src.stores import DEFAULT_STORE_ID
+from app.src.resources import prune_dir
+
+UPLOAD_DIR = Path(tempfile.gettempdir()) / "mcd_checkout_uploads"
+UPLOAD_MAX_BYTES = 100 * 1024 ** 2
+UPLOAD_MAX_AGE_SECONDS = 60 * 60
 
 DEFAULT_ITEM_KEYS = ["burger", "fries", "drink", "nuggets"]
 
@@ -82,6 +90,20 @@ def main() -> None:
         st.stop()
 
     # ===== Sidebar =====
+    st.sidebar.header("🏪 店舗")
+    # ルーターは初回のみ生成され、モデルもここで読み込まれる
+    try:
+        router = get_router()
+    except Exception as e:
+        st.sidebar.error(f"店舗プロファイルの読み込みに失敗しました: {e}")
+        st.stop()
+    store_ids = sorted(router.profiles.keys())
+    store_id = st.sidebar.selectbox(
+        "店舗ID",
+        store_ids,
+        index=store_ids.index(DEFAULT_STORE_ID),
+    )
+
     st.sidebar.header("🧾 注文")
     order_source = st.sidebar.radio("Order選択", ["demoを選択", "入力"], index=0)
 
@@ -156,10 +178,22 @@ def main() -> None:
     )
 
     if uploaded is not None:
-        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".jpg")
-        tmp.write(uploaded.getbuffer())
-        tmp.close()
-        image_path = tmp.name
+        # 再実行のたびに一時ファイルが増えないよう、内容のハッシュで名前を固定する
+        data = uploaded.getbuffer()
+        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        upload_path = UPLOAD_DIR / f"{hashlib.sha1(data).hexdigest()}.jpg"
+        try:
+            # 再利用時は mtime を更新し、他セッションの整理で消されないようにする
+            os.utime(upload_path)
+        except FileNotFoundError:
+            upload_path.write_bytes(data)
+        prune_dir(
+            UPLOAD_DIR,
+            max_bytes=UPLOAD_MAX_BYTES,
+            max_age_seconds=UPLOAD_MAX_AGE_SECONDS,
+            exclude=[upload_path],
+        )
+        image_path = str(upload_path)
 
     st.markdown("**Or choose demo image**")
 
@@ -189,7 +223,7 @@ def main() -> None:
 
     if run:
         with st.spinner("Running YOLO inference..."):
-            out = run_pipeline(order_items, image_path)
+            out = run_pipeline(order_items, image_path, store_id)
 
         vis_path = out.get("vis_image")
 